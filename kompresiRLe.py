@@ -1,14 +1,18 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
-from PIL import Image, ImageTk, ImageOps
+from PIL import Image, ImageTk
 import cv2
 import numpy as np
+import scipy.fft
 import threading
 import os
 import time
 import json
-from math import log10, sqrt
-import matplotlib.pyplot as plt
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from math import sqrt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import webbrowser
 from datetime import datetime
@@ -16,7 +20,64 @@ import platform
 import psutil
 import sys
 
+# Numba is optional; without it the NumPy/SciPy block pipeline is used
+try:
+    import numba
+    from numba import njit, prange
+    
+    # Kernels launch from the daemon DCT worker; under TBB that blocks interpreter exit.
+    # Runs are exclusive, so workqueue's no-concurrent-launch restriction never applies
+    numba.config.THREADING_LAYER = 'workqueue'
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _process_blocks(padded, basis, q_matrices, q_matrices_inv, block_size):
+        """DCT, quantize and IDCT every block of a block-aligned (C, H, W) uint8 stack"""
+        num_channels, height, width = padded.shape
+        nby = height // block_size
+        nbx = width // block_size
+        basis_t = np.ascontiguousarray(basis.T)
+        coeffs = np.empty((num_channels, nby, nbx, block_size, block_size), np.int16)
+        processed = np.empty_like(padded)
+        
+        # One block row per iteration so each thread reuses its own scratch block
+        for row in prange(num_channels * nby):
+            c = row // nby
+            y = (row % nby) * block_size
+            block = np.empty((block_size, block_size), np.float32)
+            for bx in range(nbx):
+                x = bx * block_size
+                for i in range(block_size):
+                    for j in range(block_size):
+                        block[i, j] = padded[c, y + i, x + j] - 128.0
+                        
+                quantized = np.round((basis @ block @ basis_t) * q_matrices_inv[c])
+                coeffs[c, row % nby, bx] = quantized.astype(np.int16)
+                idct_block = basis_t @ (quantized * q_matrices[c]) @ basis
+                
+                # Level shift back and clip straight into the uint8 output
+                for i in range(block_size):
+                    for j in range(block_size):
+                        processed[c, y + i, x + j] = min(max(idct_block[i, j] + np.float32(128.0), 0.0), 255.0)
+                        
+        return processed, coeffs
+else:
+    _process_blocks = None
+
+# CuPy is optional; the GPU path is offered only when a CUDA device is present
+try:
+    import cupy as cp
+    import cupyx.scipy.fft
+    GPU_AVAILABLE = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    cp = None
+    GPU_AVAILABLE = False
+
 class DCTCompressorApp:
+    MAX_HISTORY = 10  # undo steps kept in memory
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Quantum DCT Image Compressor")
@@ -28,12 +89,23 @@ class DCTCompressorApp:
         self.filename = None
         self.original_image = None
         self.processed_image = None
+        self.original_rgb = None  # RGB display mirrors, converted once per image
+        self.processed_rgb = None
         self.dct_coefficients = None
+        self._dct_thread = None
+        self._pending_undo = None
+        self._dct_basis = {}
+        self._qcache = {}
         self.compression_ratio = 1.0
         self.psnr_value = 0.0
         self.file_size_before = 0
         self.file_size_after = 0
         self.history = []
+        self._hist_line = None
+        self._last_display = {}
+        self._resize_jobs = {}
+        self._render_pool = ThreadPoolExecutor(max_workers=1)  # off-thread, one figure at a time
+        self._dct_pool = ThreadPoolExecutor(max_workers=os.cpu_count())  # concurrent channel planes
         self.settings = self.load_settings()
         
         # UI styling
@@ -274,9 +346,17 @@ class DCTCompressorApp:
         self.cmb_quantization = ttk.Combobox(controls_frame, textvariable=self.quantization, values=quantizations, state="readonly")
         self.cmb_quantization.grid(row=4, column=1, sticky=tk.EW, pady=(5, 5))
         
+        # Chroma subsampling (YCbCr only)
+        self.chroma_subsampling = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            controls_frame,
+            text="4:2:0 chroma subsampling",
+            variable=self.chroma_subsampling
+        ).grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=(5, 5))
+        
         # Process button
         btn_process = ttk.Button(controls_frame, text="Apply DCT Compression", command=self.apply_dct, style='Success.TButton')
-        btn_process.grid(row=5, column=0, columnspan=3, pady=(10, 0), sticky=tk.EW)
+        btn_process.grid(row=6, column=0, columnspan=3, pady=(10, 0), sticky=tk.EW)
         
         # Configure grid weights
         controls_frame.columnconfigure(1, weight=1)
@@ -319,8 +399,9 @@ class DCTCompressorApp:
         hist_frame = ttk.LabelFrame(parent, text="Histogram", padding=10)
         hist_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Create matplotlib figure
-        self.hist_fig, self.hist_ax = plt.subplots(figsize=(3, 2), dpi=80)
+        # Create matplotlib figure (a plain Figure; pyplot's global state isn't needed)
+        self.hist_fig = Figure(figsize=(3, 2), dpi=80)
+        self.hist_ax = self.hist_fig.add_subplot()
         self.hist_fig.patch.set_facecolor(self.style['bg'])
         self.hist_ax.set_facecolor(self.style['bg'])
         
@@ -377,6 +458,10 @@ class DCTCompressorApp:
         self.processed_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         self.processed_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Redraw the shown images once a window resize settles
+        self.original_canvas.bind('<Configure>', lambda e: self.schedule_redisplay(self.original_canvas))
+        self.processed_canvas.bind('<Configure>', lambda e: self.schedule_redisplay(self.processed_canvas))
+        
         # Default empty image display
         self.show_default_display()
         
@@ -401,6 +486,8 @@ class DCTCompressorApp:
         """Show default content when no image is loaded"""
         self.original_canvas.delete('all')
         self.processed_canvas.delete('all')
+        self._last_display.pop(self.original_canvas, None)
+        self._last_display.pop(self.processed_canvas, None)
         
         # Original canvas
         self.original_canvas.create_text(
@@ -448,14 +535,18 @@ class DCTCompressorApp:
     def load_image(self, filename):
         """Load an image from file and update the UI"""
         try:
-            # Read image with OpenCV
-            self.original_image = cv2.imread(filename)
+            # Read image with OpenCV, always in colour: it is also the display original and
+            # the PSNR reference, and Grayscale runs derive their single channel from it
+            self.original_image = cv2.imdecode(np.fromfile(filename, dtype=np.uint8), cv2.IMREAD_COLOR)
             
             if self.original_image is None:
                 raise ValueError("Unable to read image file")
                 
-            # Convert to RGB for display
-            img_rgb = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2RGB)
+            # A new image supersedes any undo snapshot still decoding
+            self._pending_undo = None
+            
+            # Convert to RGB for display once and keep the mirror for later views
+            self.original_rgb = self.to_rgb(self.original_image)
             
             # Get file info
             self.filename = filename
@@ -464,7 +555,7 @@ class DCTCompressorApp:
             height, width = dimensions[0], dimensions[1]
             
             # Update UI
-            self.display_image(self.original_canvas, img_rgb)
+            self.display_image(self.original_canvas, self.original_rgb)
             self.update_image_info(filename, width, height, self.file_size_before)
             self.update_histogram(self.original_image)
             
@@ -483,37 +574,63 @@ class DCTCompressorApp:
             messagebox.showerror("Error", f"Failed to load image:\n{str(e)}")
             self.status_message.set("Error loading image")
             
+    def to_rgb(self, image):
+        """Convert a BGR or single-channel image to RGB for display"""
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+            
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        
     def display_image(self, canvas, image):
         """Display an image on the specified canvas"""
-        canvas.delete('all')
-        
-        # Convert to PIL Image
-        pil_img = Image.fromarray(image)
-        
         # Get canvas dimensions
         canvas_width = canvas.winfo_width()
         canvas_height = canvas.winfo_height()
         
+        # Skip the resize when this image is already shown at this canvas size
+        cached = self._last_display.get(canvas)
+        if cached is not None and cached[0] is image and cached[1] == (canvas_width, canvas_height):
+            return
+            
+        canvas.delete('all')
+        
         # Calculate aspect ratio
-        img_width, img_height = pil_img.size
+        img_height, img_width = image.shape[:2]
         ratio = min(canvas_width/img_width, canvas_height/img_height)
-        new_width = int(img_width * ratio)
-        new_height = int(img_height * ratio)
+        new_width = max(1, int(img_width * ratio))
+        new_height = max(1, int(img_height * ratio))
         
-        # Resize image
-        pil_img = pil_img.resize((new_width, new_height), Image.LANCZOS)
+        # Resize with OpenCV (releases the GIL, unlike PIL's LANCZOS) and convert to PIL Image
+        resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4)
+        pil_img = Image.fromarray(resized)
         
-        # Convert to PhotoImage
-        self.tk_image = ImageTk.PhotoImage(pil_img)
+        # Convert to PhotoImage, keeping one reference per canvas
+        tk_image = ImageTk.PhotoImage(pil_img)
+        self._last_display[canvas] = (image, (canvas_width, canvas_height), tk_image)
         
         # Display centered
         x = (canvas_width - new_width) // 2
         y = (canvas_height - new_height) // 2
-        canvas.create_image(x, y, anchor=tk.NW, image=self.tk_image)
+        canvas.create_image(x, y, anchor=tk.NW, image=tk_image)
         
         # Configure scroll region
         canvas.configure(scrollregion=(0, 0, new_width, new_height))
         
+    def schedule_redisplay(self, canvas):
+        """Debounce canvas resize events into a single redraw"""
+        if canvas in self._resize_jobs:
+            self.root.after_cancel(self._resize_jobs[canvas])
+            
+        self._resize_jobs[canvas] = self.root.after(120, self._redisplay, canvas)
+        
+    def _redisplay(self, canvas):
+        """Redraw the image last shown on a canvas at its current size"""
+        self._resize_jobs.pop(canvas, None)
+        
+        cached = self._last_display.get(canvas)
+        if cached is not None:
+            self.display_image(canvas, cached[0])
+            
     def update_image_info(self, filename, width, height, size_kb):
         """Update the image information panel"""
         # Basic info
@@ -527,26 +644,41 @@ class DCTCompressorApp:
         
     def update_histogram(self, image):
         """Update the histogram display"""
-        # Clear previous histogram
-        self.hist_ax.clear()
+        self.draw_histogram(self.compute_histogram(image))
+        
+    def compute_histogram(self, image):
+        """Compute the intensity histogram of a BGR or grayscale image (no Tk access)"""
+        # Sample large images on a strided view (~512x512 pixels); the histogram shape is unchanged
+        step = max(1, int(sqrt(image.shape[0] * image.shape[1] / (512 * 512))))
+        image = image[::step, ::step]
         
         # Convert to grayscale if color image
         if len(image.shape) == 3:
             image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
-        # Calculate histogram
-        hist = cv2.calcHist([image], [0], None, [256], [0, 256])
-        
-        # Plot histogram
-        self.hist_ax.plot(hist, color='#3a7ca5')
-        self.hist_ax.set_title('Intensity Histogram', fontsize=10)
-        self.hist_ax.set_xlabel('Pixel Value', fontsize=8)
-        self.hist_ax.set_ylabel('Frequency', fontsize=8)
-        self.hist_ax.grid(True, alpha=0.3)
-        
-        # Adjust layout
-        self.hist_fig.tight_layout()
-        self.hist_canvas.draw()
+        # Calculate histogram, scaled back to full-image counts
+        return cv2.calcHist([image], [0], None, [256], [0, 256]) * (step * step)
+        
+    def draw_histogram(self, hist):
+        """Plot histogram counts from compute_histogram"""
+        if self._hist_line is None:
+            # First histogram: replace the placeholder and build the axes once
+            self.hist_ax.clear()
+            self._hist_line, = self.hist_ax.plot(hist, color='#3a7ca5')
+            self.hist_ax.set_title('Intensity Histogram', fontsize=10)
+            self.hist_ax.set_xlabel('Pixel Value', fontsize=8)
+            self.hist_ax.set_ylabel('Frequency', fontsize=8)
+            self.hist_ax.grid(True, alpha=0.3)
+            
+            # Adjust layout
+            self.hist_fig.tight_layout()
+        else:
+            # Reuse the existing line and only rescale the axes
+            self._hist_line.set_ydata(hist.ravel())
+            self.hist_ax.relim()
+            self.hist_ax.autoscale_view()
+            
+        self.hist_canvas.draw_idle()
         
     def apply_dct(self):
         """Apply DCT compression to the image"""
@@ -554,31 +686,52 @@ class DCTCompressorApp:
             messagebox.showwarning("Warning", "No image loaded to process")
             return
             
+        # Runs are exclusive: overlapping parallel Numba launches abort the process
+        # under the workqueue threading layer
+        if self._dct_thread is not None and self._dct_thread.is_alive():
+            self.status_message.set("DCT compression already in progress...")
+            return
+            
         # Get processing parameters
         compression_level = self.compression_level.get() / 100.0
         block_size = int(self.block_size.get().split('x')[0])
         color_space = self.color_space.get()
         quantization = self.quantization.get()
+        subsample_chroma = self.chroma_subsampling.get() and color_space == "YCbCr"
+        
+        # Build the quantization matrices once: luma table for Y, chroma table for Cb/Cr
+        if color_space == "YCbCr":
+            chroma_flags = [False, True, True]
+        elif color_space == "Grayscale":
+            chroma_flags = [False]
+        else:  # RGB
+            chroma_flags = [False, False, False]
+            
+        matrices = [self.get_quantization_matrices(block_size, quantization, compression_level, chroma)
+                    for chroma in chroma_flags]
+        q_matrices = np.stack([q for q, _ in matrices])
+        q_matrices_inv = np.stack([q_inv for _, q_inv in matrices])
         
         # Show progress
         self.show_progress(True)
         self.status_message.set("Applying DCT compression...")
         
         # Process in a separate thread
-        threading.Thread(
+        self._dct_thread = threading.Thread(
             target=self._apply_dct_thread,
-            args=(compression_level, block_size, color_space, quantization),
+            args=(block_size, color_space, subsample_chroma, q_matrices, q_matrices_inv),
             daemon=True
-        ).start()
+        )
+        self._dct_thread.start()
         
-    def _apply_dct_thread(self, compression_level, block_size, color_space, quantization):
+    def _apply_dct_thread(self, block_size, color_space, subsample_chroma, q_matrices, q_matrices_inv):
         """Thread function for DCT processing"""
         try:
             # Start timer
             start_time = time.time()
             
             # Process image
-            self.progress_var.set(10)
+            self._set_progress(10)
             
             # Convert color space if needed
             if color_space == "YCbCr":
@@ -590,24 +743,36 @@ class DCTCompressorApp:
             else:  # RGB
                 channels = cv2.split(self.original_image)
                 
-            self.progress_var.set(20)
-            
-            # Process each channel
-            processed_channels = []
-            dct_coeffs = []
-            
-            for i, channel in enumerate(channels):
-                # Apply DCT block processing
-                processed, coeffs = self.process_channel_dct(
-                    channel, 
-                    block_size, 
-                    compression_level,
-                    quantization
-                )
-                processed_channels.append(processed)
-                dct_coeffs.append(coeffs)
-                self.progress_var.set(20 + (i+1)*60/len(channels))
+            self._set_progress(20)
+            
+            if subsample_chroma:
+                # 4:2:0 - transform Cb/Cr at half resolution, then upsample them back
+                height, width = channels[0].shape
+                chroma_size = (max(1, width // 2), max(1, height // 2))
+                chroma = [cv2.resize(c, chroma_size, interpolation=cv2.INTER_AREA) for c in channels[1:]]
+                
+                # Full-size luma and half-size chroma are separate batches
+                groups = [(channels[:1], slice(0, 1)), (chroma, slice(1, None))]
+            elif self.settings.get('use_threading', True):
+                # One plane per group so the planes transform concurrently
+                groups = [([channel], slice(i, i + 1)) for i, channel in enumerate(channels)]
+            else:
+                # Process all channels as one batched transform
+                groups = [(channels, slice(None))]
                 
+            processed_channels, dct_coeffs = self.process_channel_groups(
+                groups, 
+                block_size, 
+                q_matrices,
+                q_matrices_inv
+            )
+            
+            if subsample_chroma:
+                processed_channels = processed_channels[:1] + [
+                    cv2.resize(c, (width, height), interpolation=cv2.INTER_LINEAR) for c in processed_channels[1:]
+                ]
+            self._set_progress(80)
+            
             # Merge channels
             if len(processed_channels) == 1:
                 processed_img = processed_channels[0]
@@ -626,73 +791,257 @@ class DCTCompressorApp:
             # Calculate metrics
             self.calculate_metrics()
             
+            # Processing time covers compression only, not the display and undo prep below
+            elapsed = time.time() - start_time
+            
+            # Prepare the RGB preview and histogram here so the Tk thread only updates widgets
+            processed_rgb = self.to_rgb(processed_img)
+            hist = self.compute_histogram(processed_img)
+            
+            # Encode the undo snapshot as lossless PNG bytes (fast compression level)
+            # here as well; on large images this takes around a second
+            success, processed_png = cv2.imencode('.png', processed_img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if not success:
+                raise ValueError("Unable to encode history snapshot")
+                
             # Update UI in main thread
-            self.root.after(0, self._update_after_dct)
+            self.root.after(0, self._update_after_dct, processed_rgb, hist, processed_png.tobytes())
             
             # Log processing time
-            elapsed = time.time() - start_time
-            self.status_message.set(f"Processing completed in {elapsed:.2f} seconds")
+            self.root.after_idle(self.status_message.set, f"Processing completed in {elapsed:.2f} seconds")
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Processing failed:\n{str(e)}"))
-            self.status_message.set("Processing failed")
+            self.root.after_idle(self.status_message.set, "Processing failed")
             
         finally:
             self.root.after(0, lambda: self.show_progress(False))
             
-    def process_channel_dct(self, channel, block_size, compression_level, quantization):
-        """Process a single channel with DCT"""
-        height, width = channel.shape
-        processed = np.zeros_like(channel, dtype=np.float32)
-        coeffs = []
-        
-        # Create quantization matrix
-        if quantization == "Standard JPEG":
-            q_matrix = self.create_jpeg_quantization_matrix(block_size)
-        elif quantization == "Uniform":
-            q_matrix = np.ones((block_size, block_size), dtype=np.float32)
-        else:  # Custom
-            q_matrix = self.create_custom_quantization_matrix(block_size)
-            
-        # Scale quantization matrix based on compression level
-        q_matrix = q_matrix * (1.0 + (1.0 - compression_level) * 10)
-        
-        # Process in blocks
-        for y in range(0, height, block_size):
-            for x in range(0, width, block_size):
-                # Get block
-                block = channel[y:y+block_size, x:x+block_size].astype(np.float32)
-                
-                # Subtract 128 for DCT
-                block -= 128
-                
-                # Apply DCT
-                dct_block = cv2.dct(block)
-                
-                # Quantize coefficients
-                quantized = np.round(dct_block / q_matrix[:block.shape[0], :block.shape[1]])
-                
-                # Store coefficients for visualization
-                coeffs.append(quantized.copy())
-                
-                # Apply inverse quantization
-                dequantized = quantized * q_matrix[:block.shape[0], :block.shape[1]]
-                
-                # Apply IDCT
-                idct_block = cv2.idct(dequantized)
-                
-                # Add 128 back
-                idct_block += 128
-                
-                # Clip values to valid range
-                idct_block = np.clip(idct_block, 0, 255)
-                
-                # Put back into image
-                processed[y:y+block_size, x:x+block_size] = idct_block
+    def process_channel_groups(self, groups, block_size, q_matrices, q_matrices_inv):
+        """Process (channels, matrix rows) groups with DCT, concurrently when threading is enabled"""
+        def process_group(group):
+            group_channels, rows = group
+            return self.process_channels_dct(group_channels, block_size, q_matrices[rows], q_matrices_inv[rows])
+            
+        # NumPy, SciPy and OpenCV release the GIL, so groups overlap on the pool; the JIT
+        # driver already spreads one call over every core, so it keeps groups sequential
+        if len(groups) > 1 and self.settings.get('use_threading', True) and not self.uses_jit_driver(block_size):
+            results = list(self._dct_pool.map(process_group, groups))
+        else:
+            results = [process_group(group) for group in groups]
+            
+        processed_channels = [channel for processed, _ in results for channel in processed]
+        dct_coeffs = [summary for _, summaries in results for summary in summaries]
+        return processed_channels, dct_coeffs
+        
+    def uses_jit_driver(self, block_size):
+        """Whether process_channels_dct runs the Numba driver for this block size"""
+        return (_process_blocks is not None and block_size != 8 and block_size <= 16
+                and not (GPU_AVAILABLE and self.settings.get('use_gpu', False)))
+        
+    def process_channels_dct(self, channels, block_size, q_matrices, q_matrices_inv):
+        """Process same-sized channels with DCT as one batched transform"""
+        stacked = np.stack(channels)
+        num_channels, height, width = stacked.shape
+        
+        # Pad to a whole number of blocks so every block has the same shape;
+        # block-aligned images (the common case) need no edge handling or copy
+        pad_y = -height % block_size
+        pad_x = -width % block_size
+        if pad_y or pad_x:
+            padded = np.pad(stacked, ((0, 0), (0, pad_y), (0, pad_x)), mode='edge')
+        else:
+            padded = stacked
+            
+        if self.uses_jit_driver(block_size):
+            # JIT driver: tiles are read from and written back to the uint8 stack directly.
+            # The thread count is per calling thread, so set it on every run from the preference
+            use_threading = self.settings.get('use_threading', True)
+            numba.set_num_threads(numba.config.NUMBA_NUM_THREADS if use_threading else 1)
+            processed, coeffs = _process_blocks(
+                padded, self.get_dct_basis(block_size), q_matrices, q_matrices_inv, block_size)
+            return list(processed[:, :height, :width]), [self.summarize_coefficients(c) for c in coeffs]
+            
+        nby = padded.shape[1] // block_size
+        nbx = padded.shape[2] // block_size
+        
+        # View the stack as a (C, nby, nbx, B, B) block tensor without copying
+        c_stride, y_stride, x_stride = padded.strides
+        block_view = np.lib.stride_tricks.as_strided(
+            padded,
+            shape=(num_channels, nby, nbx, block_size, block_size),
+            strides=(c_stride, y_stride * block_size, x_stride * block_size, y_stride, x_stride),
+            writeable=False
+        )
+        
+        # Convert to float32 and subtract 128 for DCT in a single pass into contiguous blocks
+        blocks = np.subtract(block_view, 128, dtype=np.float32, order='C')
+        
+        if GPU_AVAILABLE and self.settings.get('use_gpu', False):
+            # Whole block tensor on the GPU
+            coeffs, idct_blocks = self.transform_blocks_gpu(
+                blocks, q_matrices[:, None, None], q_matrices_inv[:, None, None])
+        elif block_size == 8:
+            # Standard JPEG block size: fixed-shape 64x64 matrix multiply path
+            coeffs, idct_blocks = self.transform_blocks_8x8(blocks, q_matrices, q_matrices_inv)
+        else:
+            # Broadcast each channel's quantization matrix over its block grid
+            coeffs, idct_blocks = self.transform_blocks(
+                blocks, block_size, q_matrices[:, None, None], q_matrices_inv[:, None, None])
+            
+        # Clip to the level-shifted range in place; adding 128 back then lands in [0, 255]
+        np.clip(idct_blocks, -128, 127, out=idct_blocks)
+        
+        # Add 128, cast to uint8 and reassemble the blocks in a single pass
+        processed = np.empty(padded.shape, np.uint8)
+        np.add(idct_blocks.swapaxes(2, 3), 128,
+               out=processed.reshape(num_channels, nby, block_size, nbx, block_size), casting='unsafe')
+        
+        # Keep only what the coefficient viewers need rather than every block
+        return list(processed[:, :height, :width]), [self.summarize_coefficients(c) for c in coeffs]
+        
+    def summarize_coefficients(self, coeffs, num_samples=5):
+        """Reduce a channel's (nby, nbx, B, B) coefficient grid to sample blocks and average magnitudes"""
+        nby, nbx = coeffs.shape[:2]
+        
+        samples = []
+        for j in range(min(num_samples, nby * nbx)):
+            by, bx = divmod(j, nbx)
+            samples.append(((by, bx), coeffs[by, bx].copy()))
+            
+        # Accumulate |coeff| one block row at a time rather than materializing
+        # an absolute-value copy of the whole grid
+        magnitude = np.zeros(coeffs.shape[2:], dtype=np.int64)
+        for block_row in coeffs:
+            magnitude += np.abs(block_row).sum(axis=0)
+            
+        # Store the log-scaled average the frequency view plots, computed once here
+        log_magnitude = np.true_divide(magnitude, nby * nbx)
+        np.log1p(log_magnitude, out=log_magnitude)
+        
+        return {
+            'blocks': samples,
+            'log_magnitude': log_magnitude
+        }
+        
+    def transform_blocks(self, blocks, block_size, q_matrix, q_matrix_inv):
+        """DCT, quantize and IDCT a block tensor with NumPy/SciPy"""
+        # Honour the multi-threading preference for the SciPy transforms
+        workers = -1 if self.settings.get('use_threading', True) else 1
+        
+        # Apply DCT to all blocks in one call
+        if block_size < 8:
+            # Tiny blocks: each side of D @ X @ D.T as one flat GEMM over every block row
+            basis = self.get_dct_basis(block_size)
+            dct_blocks = self.separable_transform(blocks, basis)
+        elif block_size <= 16:
+            # Small blocks: the separable 2-D DCT is two matrix multiplies, D @ X @ D.T
+            basis = self.get_dct_basis(block_size)
+            dct_blocks = basis @ blocks @ basis.T
+        else:
+            # The block tensor is a private temporary, so pocketfft may reuse its buffer
+            dct_blocks = scipy.fft.dctn(blocks, type=2, norm='ortho', axes=(-2, -1),
+                                        workers=workers, overwrite_x=True)
+        
+        # Quantize coefficients (kept as a single int16 array for visualization);
+        # multiply by the reciprocal and round in place on the DCT buffer
+        np.multiply(dct_blocks, q_matrix_inv, out=dct_blocks)
+        coeffs = np.rint(dct_blocks, out=dct_blocks).astype(np.int16)
+        
+        # Apply inverse quantization into the same buffer, then IDCT
+        dequantized = np.multiply(coeffs, q_matrix, out=dct_blocks)
+        if block_size < 8:
+            idct_blocks = self.separable_transform(dequantized, basis.T)
+        elif block_size <= 16:
+            idct_blocks = basis.T @ dequantized @ basis
+        else:
+            idct_blocks = scipy.fft.idctn(dequantized, type=2, norm='ortho', axes=(-2, -1),
+                                          workers=workers, overwrite_x=True)
+            
+        return coeffs, idct_blocks
+        
+    def separable_transform(self, blocks, basis):
+        """Compute basis @ X @ basis.T for every block as two (N*B, B) matrix multiplies"""
+        # Batched matmul over tiny blocks is dominated by per-block dispatch, so multiply
+        # all block rows at once: X @ basis.T, transpose every block, and repeat
+        shape = blocks.shape
+        size = shape[-1]
+        half = (blocks.reshape(-1, size) @ basis.T).reshape(shape).swapaxes(-1, -2)
+        full = np.ascontiguousarray(half).reshape(-1, size) @ basis.T
+        return full.reshape(shape).swapaxes(-1, -2)
+        
+    def transform_blocks_gpu(self, blocks, q_matrix, q_matrix_inv):
+        """DCT, quantize and IDCT a block tensor on the GPU with CuPy"""
+        gpu_blocks = cp.asarray(blocks)
+        
+        dct_blocks = cupyx.scipy.fft.dctn(gpu_blocks, type=2, norm='ortho', axes=(-2, -1))
+        coeffs = cp.round(dct_blocks * cp.asarray(q_matrix_inv)).astype(cp.int16)
+        idct_blocks = cupyx.scipy.fft.idctn(coeffs * cp.asarray(q_matrix), type=2, norm='ortho', axes=(-2, -1))
+        
+        return cp.asnumpy(coeffs), cp.asnumpy(idct_blocks)
+        
+    def transform_blocks_8x8(self, blocks, q_matrices, q_matrices_inv):
+        """DCT, quantize and IDCT 8x8 blocks as single 64-wide matrix multiplies"""
+        # For a row-major flattened block x, D @ X @ D.T equals kron(D, D) @ x, so each
+        # channel transforms in one large GEMM instead of thousands of 8x8 products
+        kron_basis = self.get_kron_dct_basis()
+        num_channels = blocks.shape[0]
+        flat_blocks = blocks.reshape(num_channels, -1, 64)
+        
+        dct_blocks = flat_blocks @ kron_basis.T
+        np.multiply(dct_blocks, q_matrices_inv.reshape(num_channels, 1, 64), out=dct_blocks)
+        coeffs = np.rint(dct_blocks, out=dct_blocks).astype(np.int16)
+        dequantized = np.multiply(coeffs, q_matrices.reshape(num_channels, 1, 64), out=dct_blocks)
+        idct_blocks = dequantized @ kron_basis
+        
+        return coeffs.reshape(blocks.shape), idct_blocks.reshape(blocks.shape)
+        
+    def get_kron_dct_basis(self):
+        """Get the 64x64 basis that applies the 8x8 2-D DCT to a flattened block"""
+        if 'kron8' not in self._dct_basis:
+            basis = self.get_dct_basis(8)
+            self._dct_basis['kron8'] = np.kron(basis, basis)
+            
+        return self._dct_basis['kron8']
+        
+    def get_dct_basis(self, size):
+        """Get the orthonormal DCT-II basis matrix for a block size"""
+        if size not in self._dct_basis:
+            self._dct_basis[size] = scipy.fft.dct(np.eye(size), type=2, norm='ortho', axis=0).astype(np.float32)
+            
+        return self._dct_basis[size]
+        
+    def get_quantization_matrices(self, block_size, quantization, compression_level, chroma=False):
+        """Get the scaled quantization matrix and its reciprocal, cached per setting"""
+        key = (block_size, quantization, compression_level, chroma)
+        
+        if key not in self._qcache:
+            # Create quantization matrix
+            if quantization == "Standard JPEG" and chroma:
+                q_matrix = self.create_jpeg_chroma_quantization_matrix(block_size)
+            elif quantization == "Standard JPEG":
+                q_matrix = self.create_jpeg_quantization_matrix(block_size)
+            elif quantization == "Uniform":
+                q_matrix = self.create_uniform_quantization_matrix(block_size)
+            else:  # Custom
+                q_matrix = self.create_custom_quantization_matrix(block_size)
                 
-        return processed.astype(np.uint8), coeffs
+            # Scale quantization matrix based on compression level
+            q_matrix = q_matrix * (1.0 + (1.0 - compression_level) * 10)
+            
+            # Quantize by multiplying with the reciprocal instead of dividing per coefficient
+            q_matrix_inv = np.reciprocal(q_matrix, dtype=np.float32)
+            
+            # Cached pairs are shared across runs, so keep them read-only
+            q_matrix.setflags(write=False)
+            q_matrix_inv.setflags(write=False)
+            self._qcache[key] = (q_matrix, q_matrix_inv)
+            
+        return self._qcache[key]
         
-    def create_jpeg_quantization_matrix(self, size):
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def create_jpeg_quantization_matrix(size):
         """Create a JPEG-like quantization matrix"""
         if size == 8:
             # Standard JPEG luminance quantization table
@@ -715,58 +1064,96 @@ class DCTCompressorApp:
             q = cv2.resize(base_q, (size, size), interpolation=cv2.INTER_LINEAR)
             q = np.clip(q, 1, 255)
             
+        # Cached and shared between calls, so guard against in-place changes
+        q.setflags(write=False)
         return q
         
-    def create_custom_quantization_matrix(self, size):
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def create_jpeg_chroma_quantization_matrix(size):
+        """Create a JPEG-like quantization matrix for the chroma channels"""
+        if size == 8:
+            # Standard JPEG chrominance quantization table
+            q = np.array([
+                [17, 18, 24, 47, 99, 99, 99, 99],
+                [18, 21, 26, 66, 99, 99, 99, 99],
+                [24, 26, 56, 99, 99, 99, 99, 99],
+                [47, 66, 99, 99, 99, 99, 99, 99],
+                [99, 99, 99, 99, 99, 99, 99, 99],
+                [99, 99, 99, 99, 99, 99, 99, 99],
+                [99, 99, 99, 99, 99, 99, 99, 99],
+                [99, 99, 99, 99, 99, 99, 99, 99]
+            ], dtype=np.float32)
+        else:
+            # Create a scaled version for other block sizes
+            base_q = np.array([[17, 18, 24, 47], 
+                              [18, 21, 26, 66], 
+                              [24, 26, 56, 99], 
+                              [47, 66, 99, 99]], dtype=np.float32)
+            q = cv2.resize(base_q, (size, size), interpolation=cv2.INTER_LINEAR)
+            q = np.clip(q, 1, 255)
+            
+        q.setflags(write=False)
+        return q
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def create_custom_quantization_matrix(size):
         """Create a custom quantization matrix that preserves more low frequencies"""
         # Create a matrix that increases quantization step with frequency
-        matrix = np.zeros((size, size), dtype=np.float32)
-        center = size // 2
-        
-        for i in range(size):
-            for j in range(size):
-                # Distance from DC coefficient (top-left corner)
-                distance = np.sqrt(i**2 + j**2)
-                # Normalize to 0-1 range
-                normalized = distance / np.sqrt(2*(size**2))
-                # Create quantization value
-                matrix[i,j] = 1 + normalized * 50  # Range from 1 to 51
-                
+        i = np.arange(size)[:, None]
+        j = np.arange(size)[None, :]
+        
+        # Distance from DC coefficient (top-left corner)
+        distance = np.sqrt(i**2 + j**2)
+        # Normalize to 0-1 range
+        normalized = distance / np.sqrt(2*(size**2))
+        # Create quantization values
+        matrix = (1 + normalized * 50).astype(np.float32)  # Range from 1 to 51
+        
+        matrix.setflags(write=False)
+        return matrix
+        
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def create_uniform_quantization_matrix(size):
+        """Create a uniform quantization matrix (every step equal to 1)"""
+        matrix = np.ones((size, size), dtype=np.float32)
+        
+        matrix.setflags(write=False)
         return matrix
         
     def calculate_metrics(self):
         """Calculate compression metrics"""
         # Calculate PSNR
-        if len(self.original_image.shape) == 3 and len(self.processed_image.shape) == 3:
-            # Color image
-            mse = np.mean((self.original_image - self.processed_image) ** 2)
-            if mse == 0:
-                self.psnr_value = float('inf')
-            else:
-                max_pixel = 255.0
-                self.psnr_value = 20 * log10(max_pixel / sqrt(mse))
-        else:
-            # Grayscale image
-            original_gray = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2GRAY)
-            processed_gray = cv2.cvtColor(self.processed_image, cv2.COLOR_BGR2GRAY)
-            mse = np.mean((original_gray - processed_gray) ** 2)
-            if mse == 0:
-                self.psnr_value = float('inf')
-            else:
-                max_pixel = 255.0
-                self.psnr_value = 20 * log10(max_pixel / sqrt(mse))
-                
+        self.psnr_value = self.compute_psnr(self.original_image, self.processed_image)
+        
         # Calculate compression ratio (simulated)
         self.compression_ratio = 1.0 / (1.0 + (100 - self.compression_level.get()) / 100.0)
         
-    def _update_after_dct(self):
+    @staticmethod
+    def compute_psnr(original, processed):
+        """PSNR between two 8-bit images, compared in grayscale when either has one channel"""
+        # Branch once on channel count and convert only the side that is still BGR;
+        # matching images go straight to OpenCV's single-pass implementation (peak 255)
+        if original.ndim == 3 and processed.ndim == 2:
+            original = cv2.cvtColor(original, cv2.COLOR_BGR2GRAY)
+        elif original.ndim == 2 and processed.ndim == 3:
+            processed = cv2.cvtColor(processed, cv2.COLOR_BGR2GRAY)
+            
+        return cv2.PSNR(original, processed)
+        
+    def _update_after_dct(self, processed_rgb, hist, processed_png):
         """Update UI after DCT processing completes"""
+        # A new result supersedes any undo snapshot still decoding
+        self._pending_undo = None
+        
         # Display processed image
-        processed_rgb = cv2.cvtColor(self.processed_image, cv2.COLOR_BGR2RGB)
-        self.display_image(self.processed_canvas, processed_rgb)
+        self.processed_rgb = processed_rgb
+        self.display_image(self.processed_canvas, self.processed_rgb)
         
         # Update histogram
-        self.update_histogram(self.processed_image)
+        self.draw_histogram(hist)
         
         # Update info panel
         self.lbl_compression.config(text=f"Compression: {self.compression_level.get()}%")
@@ -777,7 +1164,7 @@ class DCTCompressorApp:
         self.toolbar_buttons['compare'].state(['!disabled'])
         
         # Add to history
-        self.add_to_history()
+        self.add_to_history(processed_png)
         
     def save_image(self):
         """Save the processed image to file"""
@@ -804,18 +1191,25 @@ class DCTCompressorApp:
                 # Determine format from extension
                 ext = os.path.splitext(filename)[1].lower()
                 
-                # Save with appropriate parameters
+                # Encode with appropriate parameters
                 if ext in ('.jpg', '.jpeg'):
-                    cv2.imwrite(filename, self.processed_image, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+                    params = [int(cv2.IMWRITE_JPEG_QUALITY), 90]
                 elif ext == '.png':
-                    cv2.imwrite(filename, self.processed_image, [int(cv2.IMWRITE_PNG_COMPRESSION), 6])
+                    params = [int(cv2.IMWRITE_PNG_COMPRESSION), 6]
                 elif ext == '.webp':
-                    cv2.imwrite(filename, self.processed_image, [int(cv2.IMWRITE_WEBP_QUALITY), 90])
+                    params = [int(cv2.IMWRITE_WEBP_QUALITY), 90]
                 else:
-                    cv2.imwrite(filename, self.processed_image)
+                    params = []
+                success, buffer = cv2.imencode(ext, self.processed_image, params)
+                
+                if not success:
+                    raise ValueError("Unable to encode image")
                     
-                # Update file size info
-                self.file_size_after = os.path.getsize(filename) / 1024  # KB
+                # Write the encoded bytes once (mirrors np.fromfile on load)
+                buffer.tofile(filename)
+                
+                # Update file size info from the encoded buffer rather than re-reading the file
+                self.file_size_after = buffer.nbytes / 1024  # KB
                 compression_ratio = self.file_size_before / self.file_size_after
                 
                 # Show success message
@@ -859,31 +1253,25 @@ class DCTCompressorApp:
         # Switch to comparison tab
         self.display_notebook.select(self.comparison_tab)
         
-        # Create comparison image
-        original_rgb = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2RGB)
-        processed_rgb = cv2.cvtColor(self.processed_image, cv2.COLOR_BGR2RGB)
-        
-        # Convert to PIL Images
-        original_pil = Image.fromarray(original_rgb)
-        processed_pil = Image.fromarray(processed_rgb)
-        
-        # Resize to same dimensions (take min dimensions)
-        width = min(original_pil.width, processed_pil.width)
-        height = min(original_pil.height, processed_pil.height)
-        original_pil = original_pil.resize((width, height), Image.LANCZOS)
-        processed_pil = processed_pil.resize((width, height), Image.LANCZOS)
-        
-        # Create comparison image
-        comparison = Image.new('RGB', (width * 2 + 10, height))
-        comparison.paste(original_pil, (0, 0))
-        comparison.paste(processed_pil, (width + 10, 0))
-        
-        # Add divider and labels
-        draw = ImageDraw.Draw(comparison)
-        draw.line([(width + 5, 0), (width + 5, height)], fill='gray', width=2)
+        # Create comparison image from the RGB display mirrors
+        original_rgb = self.original_rgb
+        processed_rgb = self.processed_rgb
+        
+        # Resize to same dimensions (take min dimensions), only where they differ
+        height = min(original_rgb.shape[0], processed_rgb.shape[0])
+        width = min(original_rgb.shape[1], processed_rgb.shape[1])
+        if original_rgb.shape[:2] != (height, width):
+            original_rgb = cv2.resize(original_rgb, (width, height), interpolation=cv2.INTER_LANCZOS4)
+        if processed_rgb.shape[:2] != (height, width):
+            processed_rgb = cv2.resize(processed_rgb, (width, height), interpolation=cv2.INTER_LANCZOS4)
+            
+        # Black 10 px gap with a gray divider line down the middle
+        divider = np.zeros((height, 10, 3), dtype=np.uint8)
+        divider[:, 4:6] = 128
         
-        # Convert to PhotoImage
-        self.comparison_photo = ImageTk.PhotoImage(comparison)
+        # Join side by side in one pass and wrap once for Tk
+        comparison = np.concatenate([original_rgb, divider, processed_rgb], axis=1)
+        self.comparison_photo = ImageTk.PhotoImage(Image.fromarray(comparison))
         
         # Display on canvas
         self.comparison_canvas.delete('all')
@@ -925,7 +1313,7 @@ class DCTCompressorApp:
         notebook.pack(fill=tk.BOTH, expand=True)
         
         # For each channel, create a tab with coefficient visualization
-        for i, channel_coeffs in enumerate(self.dct_coefficients):
+        for i, channel_summary in enumerate(self.dct_coefficients):
             # Create frame for this channel
             frame = ttk.Frame(notebook)
             notebook.add(frame, text=f"Channel {i+1}" if len(self.dct_coefficients) > 1 else "Coefficients")
@@ -943,34 +1331,66 @@ class DCTCompressorApp:
             inner_frame = ttk.Frame(canvas)
             canvas.create_window((0, 0), window=inner_frame, anchor=tk.NW)
             
-            # Get first few blocks for visualization
-            num_blocks = min(5, len(channel_coeffs))
-            
-            for j in range(num_blocks):
-                # Create figure for this block
-                fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
-                
-                # Original coefficients
-                ax1.imshow(np.abs(channel_coeffs[j]), cmap='hot', interpolation='nearest')
-                ax1.set_title(f"Block {j+1} - Original Coefficients")
-                
-                # Thresholded coefficients (only significant ones)
-                threshold = np.percentile(np.abs(channel_coeffs[j]), 75)
-                thresholded = np.where(np.abs(channel_coeffs[j]) > threshold, channel_coeffs[j], 0)
-                ax2.imshow(np.abs(thresholded), cmap='hot', interpolation='nearest')
-                ax2.set_title(f"Block {j+1} - Significant Coefficients")
-                
-                fig.tight_layout()
+            # Sample blocks kept from the coefficient grid during processing; each
+            # figure renders on a worker and fills in its placeholder when done
+            for (by, bx), block in channel_summary['blocks']:
+                placeholder = ttk.Label(inner_frame, text=f"Rendering block ({by}, {bx})...")
+                placeholder.pack(fill=tk.X, padx=5, pady=5)
                 
-                # Embed in Tkinter
-                canvas_fig = FigureCanvasTkAgg(fig, master=inner_frame)
-                canvas_fig.draw()
-                canvas_fig.get_tk_widget().pack(fill=tk.X, padx=5, pady=5)
+                future = self._render_pool.submit(self.render_block_figure, by, bx, block)
+                future.add_done_callback(
+                    lambda f, label=placeholder, canvas=canvas: self.root.after(
+                        0, self._install_figure, label, canvas, f))
                 
             # Update scroll region
             inner_frame.update_idletasks()
             canvas.configure(scrollregion=canvas.bbox('all'))
             
+    def render_block_figure(self, by, bx, block):
+        """Render one block's coefficient figure to RGBA bytes (safe off the Tk thread)"""
+        # A standalone Figure on an Agg canvas touches no pyplot or Tk state
+        fig = Figure(figsize=(10, 4))
+        canvas = FigureCanvasAgg(fig)
+        ax1, ax2 = fig.subplots(1, 2)
+        
+        # Original coefficients
+        magnitude = np.abs(block)
+        ax1.imshow(magnitude, cmap='hot', interpolation='nearest')
+        ax1.set_title(f"Block ({by}, {bx}) - Original Coefficients")
+        
+        # Thresholded coefficients (only significant ones); a selection
+        # finds the 75th-percentile element without sorting the block
+        k = 3 * magnitude.size // 4
+        threshold = np.partition(magnitude.ravel(), k)[k]
+        ax2.imshow(magnitude * (magnitude > threshold), cmap='hot', interpolation='nearest')
+        ax2.set_title(f"Block ({by}, {bx}) - Significant Coefficients")
+        
+        fig.tight_layout()
+        canvas.draw()
+        
+        return canvas.get_width_height(), bytes(canvas.buffer_rgba())
+        
+    def _install_figure(self, label, canvas, future):
+        """Show a figure rendered by render_block_figure in its placeholder label"""
+        # The window may have been closed (or the app exited) while the figure was rendering
+        if future.cancelled() or not label.winfo_exists():
+            return
+            
+        # Report a failed render in place of the figure
+        error = future.exception()
+        if error is not None:
+            label.configure(text=f"Failed to render figure: {error}")
+            return
+            
+        size, rgba = future.result()
+        photo = ImageTk.PhotoImage(Image.frombuffer('RGBA', size, rgba, 'raw', 'RGBA', 0, 1))
+        label.configure(image=photo, text='')
+        label.image = photo  # keep a reference
+        
+        # Grow the scroll region to cover the new figure
+        label.update_idletasks()
+        canvas.configure(scrollregion=canvas.bbox('all'))
+        
     def show_frequency_domain(self):
         """Show the frequency domain representation"""
         if self.dct_coefficients is None:
@@ -987,20 +1407,20 @@ class DCTCompressorApp:
         notebook.pack(fill=tk.BOTH, expand=True)
         
         # For each channel, create a tab with frequency visualization
-        for i, channel_coeffs in enumerate(self.dct_coefficients):
+        for i, channel_summary in enumerate(self.dct_coefficients):
             # Create frame for this channel
             frame = ttk.Frame(notebook)
             notebook.add(frame, text=f"Channel {i+1}" if len(self.dct_coefficients) > 1 else "Frequency Domain")
             
-            # Calculate average magnitude of coefficients
-            avg_magnitude = np.mean([np.abs(block) for block in channel_coeffs], axis=0)
+            # Log of the average coefficient magnitude, computed during processing
+            log_magnitude = channel_summary['log_magnitude']
             
             # Create figure
-            fig = plt.Figure(figsize=(8, 6), dpi=100)
+            fig = Figure(figsize=(8, 6), dpi=100)
             ax = fig.add_subplot(111)
             
             # Display as heatmap
-            cax = ax.imshow(np.log1p(avg_magnitude), cmap='viridis', interpolation='nearest')
+            cax = ax.imshow(log_magnitude, cmap='viridis', interpolation='nearest')
             fig.colorbar(cax, ax=ax, label='Log Magnitude')
             
             ax.set_title("Average DCT Coefficient Magnitude (Log Scale)")
@@ -1012,6 +1432,10 @@ class DCTCompressorApp:
             canvas.draw()
             canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
             
+    def _set_progress(self, value):
+        """Update the progress bar from a worker thread via the Tk event loop"""
+        self.root.after_idle(self.progress_var.set, value)
+        
     def show_progress(self, show):
         """Show or hide the progress bar"""
         if show:
@@ -1020,20 +1444,25 @@ class DCTCompressorApp:
         else:
             self.progress_bar.pack_forget()
             
-    def add_to_history(self):
+    def add_to_history(self, processed_png):
         """Add current processing to history"""
         if self.original_image is not None and self.processed_image is not None:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # The processed image is kept as PNG bytes encoded by the DCT worker rather
+            # than a full-resolution array; undo only needs the processed side
             self.history.append({
                 'timestamp': timestamp,
                 'compression': self.compression_level.get(),
                 'block_size': self.block_size.get(),
                 'color_space': self.color_space.get(),
                 'psnr': self.psnr_value,
-                'original': self.original_image.copy(),
-                'processed': self.processed_image.copy()
+                'processed_png': processed_png
             })
             
+            # Drop the oldest steps beyond the limit to bound memory use
+            del self.history[:-self.MAX_HISTORY]
+            
             # Enable undo button
             self.toolbar_buttons['undo'].state(['!disabled'])
             
@@ -1042,18 +1471,10 @@ class DCTCompressorApp:
         if len(self.history) > 0:
             # Get last state
             last_state = self.history.pop()
+            self._pending_undo = last_state
             
-            # Restore processed image
-            self.processed_image = last_state['processed']
-            processed_rgb = cv2.cvtColor(self.processed_image, cv2.COLOR_BGR2RGB)
-            self.display_image(self.processed_canvas, processed_rgb)
-            
-            # Update info
-            self.lbl_compression.config(text=f"Compression: {last_state['compression']}%")
-            self.lbl_psnr.config(text=f"PSNR: {last_state['psnr']:.2f} dB")
-            
-            # Update histogram
-            self.update_histogram(self.processed_image)
+            # Decode the PNG snapshot off the Tk thread, then restore it there
+            threading.Thread(target=self._decode_history_state, args=(last_state,), daemon=True).start()
             
             # Enable redo button
             self.toolbar_buttons['redo'].state(['!disabled'])
@@ -1062,6 +1483,29 @@ class DCTCompressorApp:
             if len(self.history) == 0:
                 self.toolbar_buttons['undo'].state(['disabled'])
                 
+    def _decode_history_state(self, state):
+        """Thread function decoding a history snapshot and its display data"""
+        image = cv2.imdecode(np.frombuffer(state['processed_png'], np.uint8), cv2.IMREAD_COLOR)
+        self.root.after(0, self._restore_history_state, state, image, self.to_rgb(image), self.compute_histogram(image))
+        
+    def _restore_history_state(self, state, image, image_rgb, hist):
+        """Show a decoded history snapshot (Tk thread)"""
+        # A later undo superseded this one while it was decoding
+        if state is not self._pending_undo:
+            return
+            
+        # Restore processed image
+        self.processed_image = image
+        self.processed_rgb = image_rgb
+        self.display_image(self.processed_canvas, self.processed_rgb)
+        
+        # Update info
+        self.lbl_compression.config(text=f"Compression: {state['compression']}%")
+        self.lbl_psnr.config(text=f"PSNR: {state['psnr']:.2f} dB")
+        
+        # Update histogram
+        self.draw_histogram(hist)
+        
     def redo_action(self):
         """Redo the last undone action"""
         # Not implemented in this version
@@ -1155,6 +1599,14 @@ class DCTCompressorApp:
             variable=self.threading_var
         ).pack(anchor=tk.W)
         
+        self.gpu_var = tk.BooleanVar(value=self.settings.get('use_gpu', False) and GPU_AVAILABLE)
+        ttk.Checkbutton(
+            general_frame,
+            text="Use GPU acceleration (CUDA)" if GPU_AVAILABLE else "Use GPU acceleration (CUDA not available)",
+            variable=self.gpu_var,
+            state='normal' if GPU_AVAILABLE else 'disabled'
+        ).pack(anchor=tk.W)
+        
         # Processing tab
         processing_frame = ttk.Frame(notebook)
         notebook.add(processing_frame, text="Processing")
@@ -1202,6 +1654,7 @@ class DCTCompressorApp:
         """Save preferences to settings"""
         self.settings['theme'] = self.theme_var.get()
         self.settings['use_threading'] = self.threading_var.get()
+        self.settings['use_gpu'] = self.gpu_var.get()
         self.settings['default_compression'] = self.default_compression.get()
         self.settings['default_block_size'] = self.default_block_size.get()
         
@@ -1243,13 +1696,15 @@ class DCTCompressorApp:
             
     def start_system_monitor(self):
         """Start periodic system monitoring"""
-        self.update_system_info()
+        # Only poll while the window is on screen; minimized or withdrawn it is skipped
+        if self.root.winfo_viewable():
+            self.update_system_info()
         self.root.after(1000, self.start_system_monitor)
         
     def update_system_info(self):
         """Update system information display"""
-        # CPU usage
-        cpu_percent = psutil.cpu_percent()
+        # CPU usage since the previous poll (non-blocking)
+        cpu_percent = psutil.cpu_percent(interval=None)
         self.lbl_cpu.config(text=f"CPU: {cpu_percent}%")
         
         # Memory usage
@@ -1319,6 +1774,8 @@ class DCTCompressorApp:
     def on_exit(self):
         """Handle application exit"""
         self.save_settings()
+        self._render_pool.shutdown(wait=False, cancel_futures=True)
+        self._dct_pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
         
 if __name__ == '__main__':